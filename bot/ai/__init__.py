@@ -1,9 +1,10 @@
 # AI module - personality and routing
-from ai.personality import build_system_prompt
+from ai.personality import build_system_prompt, build_context_block
 from ai.router import process_message, generate_response
 
 __all__ = [
     "build_system_prompt",
+    "build_context_block",
     "process_message",
     "generate_response",
 ]
@@ -2,6 +2,7 @@
 
 import os
 import json
+from collections import OrderedDict
 
 
 # ---------------------------------------------------------
@@ -405,29 +406,74 @@ _TEMPLATE = """
 """
 
 
+# Cache for the rendered persona (static for the life of the process,
+# same as the character cache in tools/characters.py)
+_astral_prompt_cache = None
+
+
 def get_astral_prompt():
 
-    return _TEMPLATE.format(
-        core=_ASTRAL_CORE.format(
-            character_context=_load_character_context()
-        ),
-        examples=_FEW_SHOT_EXAMPLES
-    )
+    global _astral_prompt_cache
+
+    if _astral_prompt_cache is None:
+        _astral_prompt_cache = _TEMPLATE.format(
+            core=_ASTRAL_CORE.format(
+                character_context=_load_character_context()
+            ),
+            examples=_FEW_SHOT_EXAMPLES
+        )
+
+    return _astral_prompt_cache
 
 
 # ---------------------------------------------------------
 # PROMPT BUILDER
 # ---------------------------------------------------------
 
+_SYSTEM_PROMPT_CACHE_SIZE = 128
+_system_prompt_cache = OrderedDict()
+
+
 def build_system_prompt(
-    search_context="",
-    memory_context="",
     current_speaker=None,
-    has_vision=False
+    has_vision=False,
+    summary=""
 ):
 
+    # The summary sits right after the persona, ahead of the per-speaker
+    # lines, so persona+summary is one prefix shared by every speaker until
+    # the next summary update. It changes too often to be worth caching.
+    if summary:
+        return _render_system_prompt(current_speaker, has_vision, summary)
+
+    # The prompt depends only on these two, so each speaker's copy of the
+    # (large) persona string is assembled once and reused
+    key = (current_speaker, has_vision)
+
+    prompt = _system_prompt_cache.get(key)
+    if prompt is not None:
+        _system_prompt_cache.move_to_end(key)
+        return prompt
+
+    prompt = _render_system_prompt(current_speaker, has_vision)
+    _system_prompt_cache[key] = prompt
+
+    if len(_system_prompt_cache) > _SYSTEM_PROMPT_CACHE_SIZE:
+        _system_prompt_cache.popitem(last=False)
+
+    return prompt
+
+
+def _render_system_prompt(current_speaker, has_vision, summary=""):
+
+    # Static identity only - per-turn search/memory context goes in the
+    # user message (see build_context_block) so this prefix stays
+    # byte-identical across turns and the LLM server can reuse its KV cache
     parts = [get_astral_prompt()]
 
+    if summary:
+        parts.append(f"\n{summary}")
+
     if current_speaker:
         parts.append(
             f"\nYou are talking to: {current_speaker}.\n"
@@ -443,14 +489,27 @@ def build_system_prompt(
             "Do not reference previous conversations or old images.\n"
             "Base your response only on the vision analysis below.\n"
         )
+
+    return "\n".join(parts)
+
+
+def build_context_block(
+    search_context="",
+    memory_context="",
+    has_vision=False
+):
+
+    parts = []
+
+    if has_vision:
         # For vision mode, use XML tags for better Grok parsing
         if search_context:
-            parts.append(f"\n<vision_analysis>\n{search_context}\n</vision_analysis>")
+            parts.append(f"<vision_analysis>\n{search_context}\n</vision_analysis>")
     elif search_context:
         # Normal search results with XML tags
-        parts.append(f"\n<search_results>\n{search_context}\n</search_results>")
+        parts.append(f"<search_results>\n{search_context}\n</search_results>")
 
     if memory_context:
-        parts.append(f"\n<memory>\n{memory_context}\n</memory>")
+        parts.append(f"<memory>\n{memory_context}\n</memory>")
 
-    return "\n".join(parts)
+    return "\n\n".join(parts)
@@ -1,53 +1,102 @@
 """AI Router - LM Studio orchestration (Qwen3-Coder-30B-A3B-Instruct-Heretic)."""
 import os
+import re
 import json
+import logging
 import time
+import asyncio
 import aiohttp
-import difflib
 
-import re
-from google import genai
-from google.genai import types
+try:
+    import orjson
+except ImportError:  # Optional - stdlib json is used when it isn't installed
+    orjson = None
 
-from ai.personality import build_system_prompt
+from ai.personality import build_system_prompt, build_context_block
+from config import BotConfig
 from tools.time_utils import get_date_context
+from utils.logger import get_logger
+
+logger = get_logger(__name__)
 
-# Configure Google AI
+# Configure Google AI - only summarize_text needs Gemini here, so the SDK is
+# imported on first use rather than on every router import
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
-client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
+_gemini = None  # (client, summary config) once initialized
 
 
-def _strip_think_tags(text: str) -> str:
+def _get_gemini():
+    """Return the Gemini client and summarizer config, importing google-genai on first use."""
+    global _gemini
+    if _gemini is None:
+        from google import genai
+        from google.genai import types
+
+        _gemini = (
+            genai.Client(api_key=GEMINI_API_KEY),
+            types.GenerateContentConfig(
+                temperature=0.3,
+                max_output_tokens=1200  # Increased from 600 to allow longer summaries
+            )
+        )
+    return _gemini
+
+
+# Post-processing patterns (compiled once, run on every generated reply)
+# Think blocks in one pass: closed <think>...</think> | orphaned <think> to the end
+_THINK_RE = re.compile(r'<think>.*?</think>\s*|<think>.*', re.DOTALL)
+# Roleplay cleanup in one pass: (action) narration | asterisks
+_ROLEPLAY_RE = re.compile(r'\([a-z][^)]*\)\s*|\*+')
+_STAR_DEL_TABLE = str.maketrans('', '', '*')
+_DOUBLE_SPACE_RE = re.compile(r'  +')
+# Lookbehind anchors each attempt at the start of a whitespace run, so a long
+# run with no comma after it is scanned once instead of once per position
+_SPACE_COMMA_RE = re.compile(r'(?<!\s)\s+,')
+_SELF_NAME_RE = re.compile(r'^(?:\[?Astral\]?:\s*)', re.IGNORECASE)
+_MD_HEADER_RE = re.compile(r'^#{1,6}\s+', re.MULTILINE)
+_MD_FENCE_RE = re.compile(r'```\w*\n?')
+_MD_QUOTE_RE = re.compile(r'^>\s+', re.MULTILINE)
+_MD_RULE_RE = re.compile(r'^[-*_]{3,}\s*$', re.MULTILINE)
+_BLANK_LINES_RE = re.compile(r'\n{3,}')
+_CITATION_RE = re.compile(r'\[\[\d+\]\]')
+
+
+def _strip_think_tags(text: str, _think_sub=_THINK_RE.sub) -> str:
     """
     Strip <think>...</think> reasoning blocks from model output.
     The Deep Reasoning model outputs these for chain-of-thought, but we don't want to show them.
     """
     if not text:
         return text
-    # Remove <think>...</think> blocks (including newlines within)
-    cleaned = re.sub(r'<think>.*?</think>\s*', '', text, flags=re.DOTALL)
-    # Also strip orphaned opening <think> with no closing tag (model cut off mid-reasoning)
-    cleaned = re.sub(r'<think>.*', '', cleaned, flags=re.DOTALL)
+    # Instruct models rarely emit think tags - skip the regex scan
+    if '<think>' not in text:
+        return text.strip()
+    # Remove <think>...</think> blocks (including newlines within), and an
+    # orphaned opening <think> with no closing tag (model cut off mid-reasoning)
+    cleaned = _think_sub('', text)
     return cleaned.strip()
 
 
-def _strip_roleplay_actions(text: str) -> str:
+def _strip_roleplay_actions(text: str, _roleplay_sub=_ROLEPLAY_RE.sub, _space_sub=_DOUBLE_SPACE_RE.sub, _star_table=_STAR_DEL_TABLE) -> str:
     """
     Strip roleplay action narration from model output.
     The abliterated/roleplay-tuned models often output (pauses, blinks slowly) style actions.
     """
     if not text:
         return text
-    # Remove (action) style narration - matches parentheses with lowercase text inside
-    # Examples: (pauses), (blinks slowly), (sighs dramatically)
-    cleaned = re.sub(r'\([a-z][^)]*\)\s*', '', text)
-    # Strip asterisks from *italic* text but PRESERVE the content
-    # This handles both roleplay (*sighs*) and formatted data (*162 cm*)
-    cleaned = re.sub(r'\*([^*]+)\*', r'\1', cleaned)
-    # Strip any remaining orphaned asterisks (from **bold** markers etc)
-    cleaned = re.sub(r'\*+', '', cleaned)
-    # Clean up double spaces
-    cleaned = re.sub(r'  +', ' ', cleaned)
+    # Nothing for either pass to touch
+    if '(' not in text and '*' not in text and '  ' not in text:
+        return text.strip()
+    # Single left-to-right pass that removes:
+    # - (action) style narration: (pauses), (blinks slowly), (sighs dramatically)
+    # - every asterisk, which strips *italic* markers but PRESERVES the content
+    #   (roleplay *sighs* and formatted data *162 cm* alike) and drops orphaned
+    #   asterisks from **bold** markers etc
+    # Without any '(' only the asterisk deletion applies - str.translate does
+    # that in one C loop instead of a regex scan
+    cleaned = _roleplay_sub('', text) if '(' in text else text.translate(_star_table)
+    # Clean up double spaces left behind by the removals
+    cleaned = _space_sub(' ', cleaned)
     return cleaned.strip()
 
 
@@ -58,39 +107,63 @@ def _strip_repeated_content(text: str) -> str:
     """
     if not text:
         return text
+    # Track hashes of normalized lines rather than the lines themselves -
+    # on a looping response this keeps the set small and drops each
+    # normalized string as soon as it has been fingerprinted
+    seen: set[int] = set()
+    remember = seen.add
     lines = text.split('\n')
-    seen = set()
-    result = []
-    for line in lines:
-        # Normalize for comparison (lowercase, strip whitespace)
-        normalized = line.strip().lower()
+    # Most replies have no repeats - only start copying lines out once the
+    # first duplicate turns up, and hand back the original string otherwise
+    result = None
+    for i, line in enumerate(lines):
+        # Normalize for comparison (case-insensitive, strip whitespace)
+        normalized = line.strip().casefold()
         # Allow empty lines through, but dedupe content lines
-        if normalized and normalized in seen:
-            continue
         if normalized:
-            seen.add(normalized)
-        result.append(line)
-    return '\n'.join(result)
-
-
-def _strip_markdown(text: str) -> str:
+            fingerprint = hash(normalized)
+            if fingerprint in seen:
+                if result is None:
+                    result = lines[:i]
+                continue
+            remember(fingerprint)
+        if result is not None:
+            result.append(line)
+    return text if result is None else '\n'.join(result)
+
+
+def _strip_markdown(
+    text: str,
+    _header_sub=_MD_HEADER_RE.sub,
+    _fence_sub=_MD_FENCE_RE.sub,
+    _quote_sub=_MD_QUOTE_RE.sub,
+    _rule_sub=_MD_RULE_RE.sub,
+    _blank_sub=_BLANK_LINES_RE.sub
+) -> str:
     """Strip markdown formatting that code-focused models tend to add."""
     if not text:
         return text
+    # Each pass only runs when its marker character is present at all -
+    # plain conversational replies skip the regex engine entirely
     # Remove headers (# ## ### etc)
-    text = re.sub(r'^#{1,6}\s+', '', text, flags=re.MULTILINE)
+    if '#' in text:
+        text = _header_sub('', text)
     # Remove code fences (```python, ``` etc)
-    text = re.sub(r'```\w*\n?', '', text)
+    if '```' in text:
+        text = _fence_sub('', text)
     # Remove blockquotes
-    text = re.sub(r'^>\s+', '', text, flags=re.MULTILINE)
+    if '>' in text:
+        text = _quote_sub('', text)
     # Remove horizontal rules (---, ***, ___)
-    text = re.sub(r'^[-*_]{3,}\s*$', '', text, flags=re.MULTILINE)
+    if '-' in text or '*' in text or '_' in text:
+        text = _rule_sub('', text)
     # Clean up resulting blank lines
-    text = re.sub(r'\n{3,}', '\n\n', text)
+    if '\n\n\n' in text:
+        text = _blank_sub('\n\n', text)
     return text.strip()
 
 
-def _strip_specific_hallucinations(text: str) -> str:
+def _strip_specific_hallucinations(text: str, _comma_sub=_SPACE_COMMA_RE.sub, _space_sub=_DOUBLE_SPACE_RE.sub) -> str:
     """
     Generalized cleanup (no more hardcoded phrase stripping).
     Let the model handle itself via dynamic temperature.
@@ -99,12 +172,14 @@ def _strip_specific_hallucinations(text: str) -> str:
         return text
 
     # Cleanup any resulting double punctuation/spaces
-    text = re.sub(r'\s+,', ',', text)
-    text = re.sub(r'  +', ' ', text)
+    if ',' in text:
+        text = _comma_sub(',', text)
+    if '  ' in text:
+        text = _space_sub(' ', text)
     return text.strip()
 
 
-def _strip_citations(text: str) -> str:
+def _strip_citations(text: str, _citation_sub=_CITATION_RE.sub, _space_sub=_DOUBLE_SPACE_RE.sub) -> str:
     """
     Strip citation brackets from Grok responses.
     Grok returns citations as [[1]][[2]][[3]] etc.
@@ -113,60 +188,54 @@ def _strip_citations(text: str) -> str:
         return text
 
     # Remove citation brackets like [[1]], [[2]], etc.
-    text = re.sub(r'\[\[\d+\]\]', '', text)
+    if '[[' in text:
+        text = _citation_sub('', text)
     # Clean up any resulting double spaces
-    text = re.sub(r'  +', ' ', text)
+    if '  ' in text:
+        text = _space_sub(' ', text)
     return text.strip()
 
 
-
-def _extract_json(text: str) -> dict:
+def _clean_reply(text: str, _self_name_sub=_SELF_NAME_RE.sub) -> str:
     """
-    Extract JSON from LLM response that may contain markdown or extra text.
-    Handles: ```json {...}```, ```{...}```, raw JSON, or JSON buried in text.
+    Run the full post-processing chain on a raw model reply:
+    think tags -> roleplay -> markdown -> dedup -> cleanup -> citations -> name prefix.
+    Every stage checks for its trigger characters first, so a typical reply
+    costs a few substring scans rather than a dozen regex passes.
     """
-    if not text or not text.strip():
-        raise ValueError("Empty response")
-    
-    text = text.strip()
-    
-    # Try 1: Direct parse (ideal case)
-    try:
-        return json.loads(text)
-    except json.JSONDecodeError:
-        pass
-    
-    # Try 2: Strip markdown code blocks
-    # Matches ```json {...}``` or ```{...}```
-    code_block = re.search(r'```(?:json)?\s*(\{.*?\})\s*```', text, re.DOTALL)
-    if code_block:
-        try:
-            return json.loads(code_block.group(1))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try 3: Find JSON object anywhere in text
-    json_match = re.search(r'\{[^{}]*"search"[^{}]*\}', text, re.DOTALL)
-    if json_match:
-        try:
-            return json.loads(json_match.group(0))
-        except json.JSONDecodeError:
-            pass
-    
-    # Try 4: More aggressive - find any {...} block
-    brace_match = re.search(r'\{.*?\}', text, re.DOTALL)
-    if brace_match:
-        try:
-            return json.loads(brace_match.group(0))
-        except json.JSONDecodeError:
-            pass
-    
-    raise ValueError(f"Could not extract JSON from: {text[:100]}")
+    cleaned = _strip_think_tags(text)
+    cleaned = _strip_roleplay_actions(cleaned)
+    cleaned = _strip_markdown(cleaned)
+    cleaned = _strip_repeated_content(cleaned)
+    cleaned = _strip_specific_hallucinations(cleaned)
+    cleaned = _strip_citations(cleaned)
+    # Strip self-name prefix (model mimics transcript format "[Astral]: ..." or "Astral: ...")
+    if cleaned[:1] in ('[', 'A', 'a'):
+        cleaned = _self_name_sub('', cleaned).strip()
+    return cleaned
+
+
+def preview_reply(partial: str) -> str:
+    """
+    Clean a partially streamed reply for live display.
+    An unterminated <think> block hides everything after it, so reasoning
+    never flashes on screen before the closing tag arrives.
+    """
+    return _clean_reply(partial) if partial else ""
 
 
 # LM Studio server (OpenAI-compatible API)
 LMSTUDIO_HOST = os.getenv("LMSTUDIO_HOST", "http://host.docker.internal:1234")
 CHAT_MODEL = os.getenv("LMSTUDIO_CHAT_MODEL", "qwen3-coder-30b-a3b-instruct-heretic-i1")
+# Optional client-side cap on concurrent generations (LM Studio parallel slots /
+# vLLM batch size). Unset = requests go straight to the server, which does its
+# own queueing; set it to match the server so extra turns wait here instead.
+LMSTUDIO_PARALLEL = os.getenv("LMSTUDIO_PARALLEL")
+try:
+    _lmstudio_slots = asyncio.Semaphore(max(1, int(LMSTUDIO_PARALLEL))) if LMSTUDIO_PARALLEL else None
+except ValueError:
+    logger.warning("[LMStudio] Ignoring non-numeric LMSTUDIO_PARALLEL=%r - requests stay ungated", LMSTUDIO_PARALLEL)
+    _lmstudio_slots = None
 
 # xAI Grok API
 XAI_API_KEY = os.getenv("XAI_API_KEY")
@@ -174,55 +243,182 @@ XAI_MODEL = os.getenv("XAI_MODEL", "grok-4-1-fast-reasoning")
 XAI_HOST = os.getenv("XAI_HOST", "https://api.x.ai")
 LLM_BACKEND = os.getenv("LLM_BACKEND", "lmstudio")
 
-print(f"[Router] Backend: {LLM_BACKEND} | Host: {LMSTUDIO_HOST if LLM_BACKEND == 'lmstudio' else XAI_HOST} | Model: {CHAT_MODEL if LLM_BACKEND == 'lmstudio' else XAI_MODEL}")
+# Stop sequences to prevent roleplaying other users (crucial for uncensored models)
+_STOP_SEQUENCES = ("\n[", "[Hiep]", "[User]")
+
+# Reply used when generation fails
+_FALLBACK_REPLY = "something broke on my end, try again?"
+
+# Shared HTTP session - reuses keep-alive connections to LM Studio / xAI across calls
+_session: aiohttp.ClientSession | None = None
+
+# Request timeouts, built once. connect fails fast when the server is down
+# instead of holding the turn for the full generation budget.
+_LMSTUDIO_TIMEOUT = aiohttp.ClientTimeout(total=120, connect=10)
+_GROK_TIMEOUT = aiohttp.ClientTimeout(total=180, connect=10)  # Longer for server-side tool execution
+
+# Wire-format JSON for request bodies and responses (orjson when available).
+# Both work on bytes directly, skipping the str round-trip aiohttp's json=/
+# resp.json() would do on the (tens of KB) prompt payloads.
+if orjson is not None:
+    _json_loads = orjson.loads
+    _json_dumps = orjson.dumps
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        # Raw UTF-8 like orjson - \uXXXX-escaping emoji/CJK/diacritics would
+        # inflate every prompt payload
+        return json.dumps(obj, ensure_ascii=False).encode()
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared aiohttp session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(
+                limit=32,
+                limit_per_host=16,
+                keepalive_timeout=60,
+                ttl_dns_cache=300,
+                enable_cleanup_closed=True
+            ),
+            timeout=_LMSTUDIO_TIMEOUT
+        )
+    return _session
+
 
+async def close_session():
+    """Close the shared aiohttp session (call on bot shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
 
-async def _call_lmstudio(messages: list, temperature: float = 0.6, max_tokens: int = 8000, stop: list = None, presence_penalty: float = 0.3, frequency_penalty: float = 0.1, model: str = None) -> dict:
+
+async def _read_sse_stream(resp: aiohttp.ClientResponse, on_text=None) -> tuple[str, dict]:
+    """Consume an OpenAI-style SSE completion stream.
+    Returns (text, usage). If the stream stalls past the request timeout,
+    whatever was generated so far is returned instead of being thrown away.
+    on_text, if given, is called with each text delta as it arrives.
+    """
+    parts = []
+    usage = {}
+    try:
+        async for raw_line in resp.content:
+            line = raw_line.strip()
+            if not line.startswith(b"data:"):
+                continue
+            chunk = line[5:].strip()
+            if chunk == b"[DONE]":
+                break
+            event = _json_loads(chunk)
+            if event.get("usage"):
+                usage = event["usage"]
+            choices = event.get("choices")
+            if not choices:
+                continue
+            piece = choices[0].get("delta", {}).get("content")
+            if piece:
+                parts.append(piece)
+                if on_text:
+                    on_text(piece)
+    except asyncio.TimeoutError:
+        if not parts:
+            raise
+        logger.warning("[LMStudio] Stream timed out, keeping partial response (%d chunks)", len(parts))
+
+    if not usage:
+        # Server didn't report usage - each content delta is roughly one token
+        usage = {"completion_tokens": len(parts)}
+    return "".join(parts), usage
+
+
+logger.info(
+    "[Router] Backend: %s | Host: %s | Model: %s",
+    LLM_BACKEND,
+    LMSTUDIO_HOST if LLM_BACKEND == "lmstudio" else XAI_HOST,
+    CHAT_MODEL if LLM_BACKEND == "lmstudio" else XAI_MODEL,
+)
+
+
+# Fixed sampling parameters sent with every LM Studio request
+_LMSTUDIO_SAMPLING = {
+    "top_p": 0.8,
+    "top_k": 20,
+    "min_p": 0,
+    "repeat_penalty": 1.05,  # Qwen3-Coder recommended: helps with instruction following
+}
+_STREAM_OPTIONS = {"include_usage": True}
+
+
+async def _call_lmstudio(messages: list, temperature: float = 0.6, max_tokens: int = 8000, stop: list = None, presence_penalty: float = 0.3, frequency_penalty: float = 0.1, model: str = None, stream: bool = False, on_text=None) -> dict:
     """Make a request to LM Studio's OpenAI-compatible API.
     Returns dict with 'text', 'tokens', 'tps' keys (or None on failure).
+
+    With stream=True the completion is read as SSE chunks as they are
+    generated, so a stalled generation still yields its partial text, and
+    on_text receives each chunk for live display.
     """
     payload = {
+        **_LMSTUDIO_SAMPLING,
         "model": model or CHAT_MODEL,
         "messages": messages,
         "temperature": temperature,
         "max_tokens": max_tokens,
-        "stream": False,
-        "top_p": 0.8,
-        "top_k": 20,
-        "min_p": 0,
-        "repeat_penalty": 1.05,  # Qwen3-Coder recommended: helps with instruction following
+        "stream": stream,
         "presence_penalty": presence_penalty,
         "frequency_penalty": frequency_penalty,
     }
     if stop:
         payload["stop"] = stop
+    if stream:
+        payload["stream_options"] = _STREAM_OPTIONS
 
     try:
-        start_time = time.perf_counter()
-        async with aiohttp.ClientSession() as session:
+        session = await _get_session()
+        if _lmstudio_slots is not None:
+            # Bounded like the request itself - a turn stuck behind busy slots
+            # gives up instead of waiting forever
+            try:
+                await asyncio.wait_for(_lmstudio_slots.acquire(), timeout=_LMSTUDIO_TIMEOUT.total)
+            except asyncio.TimeoutError:
+                logger.error("[LMStudio] No free generation slot after %ss", _LMSTUDIO_TIMEOUT.total)
+                return None
+        try:
+            start_time = time.perf_counter()
             async with session.post(
                 f"{LMSTUDIO_HOST}/v1/chat/completions",
-                json=payload,
-                timeout=aiohttp.ClientTimeout(total=120)
+                data=_json_dumps(payload),
+                headers=_JSON_HEADERS
             ) as resp:
                 if resp.status != 200:
                     error = await resp.text()
-                    print(f"[LMStudio] Error {resp.status}: {error[:200]}")
+                    logger.error("[LMStudio] Error %s: %s", resp.status, error[:200])
                     return None
 
-                data = await resp.json()
-        elapsed = time.perf_counter() - start_time
+                if stream:
+                    text, usage = await _read_sse_stream(resp, on_text)
+                else:
+                    data = _json_loads(await resp.read())
+                    text = data["choices"][0]["message"]["content"]
+                    usage = data.get("usage", {})
+            elapsed = time.perf_counter() - start_time
+        finally:
+            if _lmstudio_slots is not None:
+                _lmstudio_slots.release()
 
-        text = data["choices"][0]["message"]["content"]
-        usage = data.get("usage", {})
         completion_tokens = usage.get("completion_tokens", 0)
         tps = completion_tokens / elapsed if elapsed > 0 and completion_tokens else 0
 
-        print(f"[LMStudio] {completion_tokens} tokens in {elapsed:.2f}s | {tps:.1f} T/s")
+        logger.info("[LMStudio] %d tokens in %.2fs | %.1f T/s", completion_tokens, elapsed, tps)
 
         return {"text": text, "tokens": completion_tokens, "tps": round(tps, 1)}
     except Exception as e:
-        print(f"[LMStudio] Request failed: {e}")
+        logger.error("[LMStudio] Request failed: %s", e)
         return None
 
 
@@ -242,7 +438,7 @@ async def _call_grok(messages: list, temperature: float = 0.7, max_tokens: int =
         enable_vision: Enable image understanding in searches
     """
     if not XAI_API_KEY:
-        print("[Grok] Error: XAI_API_KEY not set")
+        logger.error("[Grok] Error: XAI_API_KEY not set")
         return None
 
     # Convert messages format: "messages" -> "input" for /v1/responses endpoint
@@ -280,8 +476,8 @@ async def _call_grok(messages: list, temperature: float = 0.7, max_tokens: int =
     # Debug: Log if vision input detected
     has_vision_content = any(isinstance(m.get("content"), list) for m in input_messages if isinstance(m, dict))
     if enable_vision or has_vision_content:
-        print(f"[Grok] Vision mode detected - enable_vision={enable_vision}, has_vision_content={has_vision_content}")
-        print(f"[Grok] First message content type: {type(input_messages[-1].get('content') if input_messages else None)}")
+        logger.debug("[Grok] Vision mode detected - enable_vision=%s, has_vision_content=%s", enable_vision, has_vision_content)
+        logger.debug("[Grok] First message content type: %s", type(input_messages[-1].get('content') if input_messages else None))
 
     # Use /v1/chat/completions for vision (OpenAI-compatible), /v1/responses for text+search
     endpoint = "/v1/chat/completions" if has_vision_content else "/v1/responses"
@@ -296,32 +492,32 @@ async def _call_grok(messages: list, temperature: float = 0.7, max_tokens: int =
             "max_tokens": max_tokens,
             "stream": False
         }
-        print(f"[Grok] Using /v1/chat/completions for vision")
+        logger.debug("[Grok] Using /v1/chat/completions for vision")
 
     try:
         start_time = time.perf_counter()
-        async with aiohttp.ClientSession() as session:
-            async with session.post(
-                f"{XAI_HOST}{endpoint}",
-                json=payload,
-                headers=headers,
-                timeout=aiohttp.ClientTimeout(total=180)  # Increased timeout for tool execution
-            ) as resp:
-                if resp.status != 200:
-                    error = await resp.text()
-                    print(f"[Grok] Error {resp.status}: {error[:500]}")
-                    return None
-
-                data = await resp.json()
+        session = await _get_session()
+        async with session.post(
+            f"{XAI_HOST}{endpoint}",
+            data=_json_dumps(payload),
+            headers=headers,
+            timeout=_GROK_TIMEOUT
+        ) as resp:
+            if resp.status != 200:
+                error = await resp.text()
+                logger.error("[Grok] Error %s: %s", resp.status, error[:500])
+                return None
+
+            data = _json_loads(await resp.read())
         elapsed = time.perf_counter() - start_time
 
         # Check for errors first
         if "error" in data and data["error"]:
-            print(f"[Grok] API Error: {data['error']}")
+            logger.error("[Grok] API Error: %s", data['error'])
             return None
 
         if "status" in data and data["status"] != "completed":
-            print(f"[Grok] Incomplete response. Details: {data.get('incomplete_details', 'N/A')}")
+            logger.warning("[Grok] Incomplete response. Details: %s", data.get('incomplete_details', 'N/A'))
             return None
 
         # Response format for /v1/responses endpoint
@@ -409,8 +605,9 @@ async def _call_grok(messages: list, temperature: float = 0.7, max_tokens: int =
                 text = str(data["output"])
 
         if not text:
-            print(f"[Grok] Could not extract text from response. Keys: {list(data.keys())}")
-            print(f"[Grok] Response data: {json.dumps(data, indent=2)[:500]}")
+            logger.warning("[Grok] Could not extract text from response. Keys: %s", list(data.keys()))
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("[Grok] Response data: %s", json.dumps(data, indent=2)[:500])
             return None
 
         # Extract usage and citations
@@ -457,9 +654,7 @@ async def _call_grok(messages: list, temperature: float = 0.7, max_tokens: int =
             "citations": citations
         }
     except Exception as e:
-        print(f"[Grok] Request failed: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.error("[Grok] Request failed: %s", e, exc_info=True)
         return None
 
 
@@ -470,69 +665,80 @@ async def generate_response(
     conversation_history: list[dict] = None,
     current_speaker: str = None,
     has_vision: bool = False,
-    image_url: str = None
+    image_url: str = None,
+    summary: str = "",
+    on_text=None
 ) -> str:
     """
     Generate an Astral response using proper system/user ChatML roles.
 
-    System message: personality + search results + memory (high instruction priority)
-    User message: conversation transcript + current question (with optional image)
+    System message: personality + rolling summary + speaker identity (static
+    between summary updates, prefix-cacheable)
+    User message: search results + memory + conversation transcript + current
+    question (with optional image)
+
+    conversation_history is used as-is: callers bound it at ingress
+    (SharedMemoryManager.format_for_router keeps the last ROUTER_HISTORY
+    messages) and pass the summary of everything older via `summary`.
+
+    on_text receives raw text deltas while LM Studio streams the reply (see
+    preview_reply); the returned string is always the fully cleaned reply.
 
     For Grok: Uses /v1/responses endpoint with native vision support.
     For LM Studio: Uses /v1/chat/completions (OpenAI-compatible).
     """
-    # Build system prompt with context AND speaker identity
-    system_prompt = build_system_prompt(search_context, memory_context, current_speaker, has_vision)
-
-    # Add date awareness
-    system_prompt = f"{get_date_context()}\n\n{system_prompt}"
-
-    # Build transcript from conversation history (last 50 messages)
+    # Build system prompt with speaker identity. It opens with the persona and
+    # must stay byte-stable - anything per-turn (date, search, memory) goes in
+    # the user message so the server's KV cache for this prefix survives. The
+    # summary of evicted history (changes rarely) goes ahead of the speaker
+    # lines so that cached prefix is shared across speakers
+    system_prompt = build_system_prompt(current_speaker, has_vision, summary)
+
+    # Build transcript from conversation history (already bounded by the caller)
     transcript_lines = []
+    add_line = transcript_lines.append
     if conversation_history:
-        for msg in conversation_history[-50:]:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
-            
+        for msg in conversation_history:
+            content = msg["content"]
+
             # Extract speaker from content if formatted as [Speaker]: message
             if content.startswith("[") and "]:" in content:
                 # Already formatted, use as-is
-                transcript_lines.append(content)
-            elif role == "assistant":
-                transcript_lines.append(f"[Astral]: {content}")
+                add_line(content)
+            elif msg.get("role") == "assistant":
+                add_line("[Astral]: " + content)
+            # Check for image indicator in content
+            elif "[shares an image]" in content or "[Image:" in content:
+                add_line(content)
             else:
-                # Check for image indicator in content
-                if "[shares an image]" in content or "[Image:" in content:
-                    transcript_lines.append(content)
-                else:
-                    transcript_lines.append(f"[User]: {content}")
-    
+                add_line("[User]: " + content)
+
     # Add current message
-    if current_speaker:
-        transcript_lines.append(f"[{current_speaker}]: {user_message}")
-    else:
-        transcript_lines.append(f"[User]: {user_message}")
+    add_line(f"[{current_speaker or 'User'}]: {user_message}")
     
     transcript = "\n".join(transcript_lines)
     
-    # Build user message with transcript only (system prompt is in system role)
+    # Build user message: date awareness and dynamic context first, then the transcript
+    user_text = f"""[Transcript - Last {len(transcript_lines)} Messages]
+{transcript}
+
+Reply to the last message as Astral. Do not output internal thoughts."""
+    context_block = build_context_block(search_context, memory_context, has_vision)
+    if context_block:
+        user_text = f"{context_block}\n\n{user_text}"
+    user_text = f"{get_date_context()}\n\n{user_text}"
+
     # For images, use multi-modal content format
     if image_url and LLM_BACKEND == "grok":
         # Grok vision: Use /v1/chat/completions format (OpenAI-compatible)
         # /v1/responses with vision seems to hang - use simpler format
         user_content = [
-            {"type": "text", "text": f"""[Transcript - Last {len(transcript_lines)} Messages]
-{transcript}
-
-Reply to the last message as Astral. Do not output internal thoughts."""},
+            {"type": "text", "text": user_text},
             {"type": "image_url", "image_url": {"url": image_url, "detail": "high"}}
         ]
     else:
         # Text-only or LM Studio (no native vision)
-        user_content = f"""[Transcript - Last {len(transcript_lines)} Messages]
-{transcript}
-
-Reply to the last message as Astral. Do not output internal thoughts."""
+        user_content = user_text
 
     # Proper system/user role separation
     messages = [
@@ -540,14 +746,12 @@ Reply to the last message as Astral. Do not output internal thoughts."""
         {"role": "user", "content": user_content}
     ]
     
-    # Stop sequences to prevent roleplaying other users (crucial for uncensored models)
-    stop_sequences = ["\n[", "[Hiep]", "[User]"]
-
-    
     try:
-        print(f"[Router] Query: '{user_message[:50]}' | Search: {len(search_context)} chars | History: {len(transcript_lines)} msgs")
+        logger.debug("[Router] Query: %r | Search: %d chars | History: %d msgs", user_message[:50], len(search_context), len(transcript_lines))
         
-        tokens = 4000 if search_context else 8000
+        # Output budget from BotConfig - replies end at EOS long before it; the cap
+        # only bounds how long a runaway generation loop can hold the turn
+        tokens = BotConfig.DEFAULT_RESPONSE_TOKENS if search_context else BotConfig.RESPONSE_TOKENS_NO_CONTEXT
 
         # [DYNAMIC CREATIVITY]
         # Check if the last bot message was repetitive to break loops naturally
@@ -577,13 +781,19 @@ Reply to the last message as Astral. Do not output internal thoughts."""
              
              # Did the USER repeat themselves exactly?
              # Check last 3 user messages for identical content
-             user_history = [m.get("content", "") for m in reversed(conversation_history or []) if m.get("role") == "user"]
+             # Only the newest two user messages matter - stop scanning once found
+             user_history = []
+             for m in reversed(conversation_history or []):
+                 if m.get("role") == "user":
+                     user_history.append(m.get("content", ""))
+                     if len(user_history) == 2:
+                         break
              if len(user_history) >= 2:
                  if user_message.strip().lower() == user_history[0].strip().lower():
                      is_stuck = True
 
         if is_stuck:
-            print("[Router] Loop detected! Spiking creativity parameters.")
+            logger.info("[Router] Loop detected! Spiking creativity parameters.")
             temp = min(temp + 0.15, 1.2)
             pres_pen = min(pres_pen + 0.2, 0.5)
             freq_pen = min(freq_pen + 0.1, 0.25)
@@ -605,29 +815,26 @@ Reply to the last message as Astral. Do not output internal thoughts."""
                 messages=messages,
                 temperature=temp,
                 max_tokens=tokens,
-                stop=stop_sequences,
+                stop=_STOP_SEQUENCES,
                 presence_penalty=pres_pen,
-                frequency_penalty=freq_pen
+                frequency_penalty=freq_pen,
+                stream=True,
+                on_text=on_text
             )
 
         if not result:
-            return "something broke on my end, try again?"
-
-        # Chain all post-processing: think tags -> roleplay -> markdown -> dedup -> citations -> name prefix
-        cleaned = _strip_think_tags(result["text"])
-        cleaned = _strip_roleplay_actions(cleaned)
-        cleaned = _strip_markdown(cleaned)
-        cleaned = _strip_repeated_content(cleaned)
-        cleaned = _strip_specific_hallucinations(cleaned)
-        cleaned = _strip_citations(cleaned)
-        # Strip self-name prefix (model mimics transcript format "[Astral]: ..." or "Astral: ...")
-        cleaned = re.sub(r'^(?:\[?Astral\]?:\s*)', '', cleaned, flags=re.IGNORECASE).strip()
+            return _FALLBACK_REPLY
+
+        cleaned = _clean_reply(result["text"])
 
         # OUTPUT LOOP DETECTION: Compare with last bot message
         if last_bot_msg and len(last_bot_msg) > 10 and len(cleaned) > 10:
-            similarity = difflib.SequenceMatcher(None, cleaned.lower(), last_bot_msg.lower()).ratio()
+            # difflib (and its heapq import) is only needed on this path
+            from difflib import SequenceMatcher
+
+            similarity = SequenceMatcher(None, cleaned.lower(), last_bot_msg.lower()).ratio()
             if similarity > 0.6:
-                print(f"[Router] Output loop detected (similarity={similarity:.2f}), regenerating with spiked params")
+                logger.info("[Router] Output loop detected (similarity=%.2f), regenerating with spiked params", similarity)
 
                 if LLM_BACKEND == "grok":
                     retry = await _call_grok(
@@ -643,24 +850,20 @@ Reply to the last message as Astral. Do not output internal thoughts."""
                         messages=messages,
                         temperature=min(temp + 0.2, 1.2),
                         max_tokens=tokens,
-                        stop=stop_sequences,
+                        stop=_STOP_SEQUENCES,
                         presence_penalty=min(pres_pen + 0.3, 0.6),
-                        frequency_penalty=min(freq_pen + 0.15, 0.25)
+                        frequency_penalty=min(freq_pen + 0.15, 0.25),
+                        stream=True
                     )
 
                 if retry:
-                    cleaned = _strip_think_tags(retry["text"])
-                    cleaned = _strip_roleplay_actions(cleaned)
-                    cleaned = _strip_markdown(cleaned)
-                    cleaned = _strip_repeated_content(cleaned)
-                    cleaned = _strip_specific_hallucinations(cleaned)
-                    cleaned = re.sub(r'^(?:\[?Astral\]?:\s*)', '', cleaned, flags=re.IGNORECASE).strip()
+                    cleaned = _clean_reply(retry["text"])
 
         return cleaned
     
     except Exception as e:
-        print(f"[LMStudio Error] {e}")
-        return "something broke on my end, try again?"
+        logger.error("[LMStudio Error] %s", e, exc_info=True)
+        return _FALLBACK_REPLY
 
 
 async def summarize_text(text: str) -> str:
@@ -687,17 +890,15 @@ async def summarize_text(text: str) -> str:
     )
 
     try:
+        client, summary_config = _get_gemini()
         response = client.models.generate_content(
             model="gemini-2.5-flash",
             contents=f"{system_prompt}\n\nConversation History:\n{text}",
-            config=types.GenerateContentConfig(
-                temperature=0.3,
-                max_output_tokens=1200  # Increased from 600 to allow longer summaries
-            )
+            config=summary_config
         )
         return response.text.strip()
     except Exception as e:
-        print(f"[Summarizer Error] {e}")
+        logger.error("[Summarizer Error] %s", e)
         return ""  # Fallback to empty summary on failure (safe fail)
 
 
@@ -708,14 +909,16 @@ async def process_message(
     memory_context: str = "",
     current_speaker: str = None,
     has_vision: bool = False,
-    image_url: str = None
+    image_url: str = None,
+    summary: str = "",
+    on_text=None
 ) -> str:
     """
     Full message processing pipeline.
-    Search context passed through from chat.py.
+    Search context and the rolling summary are passed through from chat.py.
     """
     if search_context:
-        print(f"[Router] Using search context ({len(search_context)} chars)")
+        logger.debug("[Router] Using search context (%d chars)", len(search_context))
 
     response = await generate_response(
         user_message=user_message,
@@ -724,7 +927,9 @@ async def process_message(
         conversation_history=conversation_history,
         current_speaker=current_speaker,
         has_vision=has_vision,
-        image_url=image_url
+        image_url=image_url,
+        summary=summary,
+        on_text=on_text
     )
 
     return response
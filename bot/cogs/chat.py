@@ -2,26 +2,132 @@
 import discord
 from discord.ext import commands
 import re
-import traceback
+import time
 import os
 
 from config import BotConfig
-from ai.router import process_message
+from ai.router import process_message, preview_reply
 
 from memory import (
     retrieve_relevant_knowledge,
     store_conversation,
-    store_full_search,  # Deprecated no-op
     format_knowledge_for_context
 )
 from memory.shared_memory import SharedMemoryManager
 from tools.vision import get_recent_image_context
 from tools.voice_handler import get_voice_handler
 from tools.admin import whitelist, ADMIN_IDS
+from utils.logger import get_logger
 import asyncio
 
-# Regex to strip deterministic footers from Astral's own messages in history
-FOOTER_REGEX = re.compile(r'\n\n[💡🔍]\d+(?:\s[💡🔍]\d+)*$', re.DOTALL)
+logger = get_logger(__name__)
+
+# User/role mentions (<@id> and <@!id>) stripped from incoming messages
+MENTION_REGEX = re.compile(r'<@!?\d+>')
+
+# Draw requests (handled by the draw cog): a keyword at the start or after a space
+DRAW_REQUEST_REGEX = re.compile(r'(?:^| )(?:draw |gdraw |sketch |paint |create an image|create a picture|guided draw)')
+
+# Citation markers ([1], [🔍1], [💡2]) stripped so TTS doesn't read them aloud
+CITATION_REGEX = re.compile(r'\[(?:🔍|💡)?\d+\]')
+
+# Strong references to fire-and-forget tasks - the event loop only keeps weak
+# ones, so an unreferenced task can be garbage-collected mid-flight
+_background_tasks: set[asyncio.Task] = set()
+
+
+def spawn_background(coro) -> asyncio.Task:
+    """Run a coroutine in the background without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+def split_for_discord(text: str, limit: int = 2000):
+    """
+    Yield message-sized chunks of text, breaking at the last newline (or
+    space) inside each window so lines, words and emoji aren't cut in half.
+    """
+    start = 0
+    while len(text) - start > limit:
+        cut = text.rfind('\n', start, start + limit)
+        if cut <= start:
+            cut = text.rfind(' ', start, start + limit)
+        if cut <= start:
+            cut = start + limit  # One unbroken run - hard split
+            next_start = cut
+        else:
+            next_start = cut + 1  # Drop the separator itself
+        chunk = text[start:cut]
+        if chunk.strip():
+            yield chunk
+        start = next_start
+    if text[start:].strip():
+        yield text[start:]
+
+
+class ReplyStreamer:
+    """
+    Shows a reply while it is still generating by editing one message in place.
+    feed() receives every streamed text delta; edits are throttled to
+    STREAM_EDIT_INTERVAL to stay inside Discord's edit rate limit.
+    """
+
+    def __init__(self, channel):
+        self.channel = channel
+        self.parts = []
+        self.message = None
+        self._last_flush = 0.0
+        self._flush_task = None
+
+    def feed(self, piece: str):
+        self.parts.append(piece)
+        if self._flush_task and not self._flush_task.done():
+            return
+        now = time.monotonic()
+        if now - self._last_flush >= BotConfig.STREAM_EDIT_INTERVAL:
+            self._last_flush = now
+            self._flush_task = asyncio.create_task(self._flush())
+
+    async def _flush(self):
+        preview = preview_reply("".join(self.parts))[:2000]
+        if not preview:
+            return
+        try:
+            if self.message is None:
+                self.message = await self.channel.send(preview)
+            else:
+                await self.message.edit(content=preview)
+        except discord.HTTPException as e:
+            logger.warning("[Chat] Stream preview update failed: %s", e)
+
+    async def finish(self, response: str) -> bool | None:
+        """
+        Swap the final reply into the preview message.
+        Returns True if the preview now shows the reply, False if there is no
+        preview left (caller sends normally), or None if a stale preview could
+        be neither edited nor deleted (caller must not post a second copy).
+        """
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        if self.message is None:
+            return False
+        if len(response) <= 2000:
+            try:
+                await self.message.edit(content=response)
+                return True
+            except discord.HTTPException as e:
+                logger.warning("[Chat] Stream preview edit failed: %s", e)
+        # Multi-message reply or failed edit - drop the preview and let the caller send
+        try:
+            await self.message.delete()
+        except discord.NotFound:
+            pass  # Already gone - nothing left to duplicate
+        except discord.HTTPException as e:
+            logger.warning("[Chat] Stream preview delete failed: %s", e)
+            return None
+        return False
 
 
 class ChatCog(commands.Cog):
@@ -34,6 +140,25 @@ class ChatCog(commands.Cog):
         self.shared_memory = SharedMemoryManager(data_dir)
         # Note: Summarization is handled by GemGem, Astral just reads the summary
     
+    def _load_router_context(self) -> tuple[list, list, str]:
+        """Load shared history and format it for the router (blocking file I/O - run in a thread).
+        format_for_router bounds the window (30 messages if a summary exists).
+        """
+        shared_history = self.shared_memory.load_memory()
+        formatted_history, summary_context = self.shared_memory.format_for_router(shared_history)
+        return shared_history, formatted_history, summary_context
+
+    async def _retrieve_knowledge(self, content: str) -> list:
+        """RAG lookup bounded by RAG_TIMEOUT so a hung embedding/DB call can't stall the reply."""
+        try:
+            return await asyncio.wait_for(
+                retrieve_relevant_knowledge(content, limit=BotConfig.RAG_FACT_LIMIT),
+                timeout=BotConfig.RAG_TIMEOUT
+            )
+        except asyncio.TimeoutError:
+            logger.warning("[RAG] Retrieval timed out after %ss, continuing without memories", BotConfig.RAG_TIMEOUT)
+            return []
+
     @commands.Cog.listener()
     async def on_message(self, message: discord.Message):
         """Handle incoming messages with Logic AI routing."""
@@ -48,28 +173,32 @@ class ChatCog(commands.Cog):
         if not (is_mentioned or is_dm):
             return
 
+        # Resolved once - display_name is a property walking nick/global_name/name
+        speaker_name = message.author.display_name
+        author_id = message.author.id
+
         # Debug: Log all messages that mention the bot
-        print(f"[Chat] Received mention from {message.author.display_name} (ID: {message.author.id})")
+        logger.debug("[Chat] Received mention from %s (ID: %s)", speaker_name, author_id)
 
         # 🛡️ AUTHORIZATION CHECK (Silent ignore for unauthorized users)
-        if not whitelist.is_authorized(message.author.id):
-            print(f"[Chat] ⚠️ Unauthorized user: {message.author.display_name} (ID: {message.author.id})")
+        if not whitelist.is_authorized(author_id):
+            logger.info("[Chat] ⚠️ Unauthorized user: %s (ID: %s)", speaker_name, author_id)
             return
         
         # Clean the message (remove bot mention - handle both <@id> and <@!id> formats)
         # Use message.content instead of clean_content to preserve URLs
         try:
-            content = re.sub(r'<@!?\d+>', '', message.content).strip()
-            print(f"[Chat] Message content after cleaning: '{content[:100]}'")
+            content = MENTION_REGEX.sub('', message.content).strip()
+            logger.debug("[Chat] Message content after cleaning: %r", content[:100])
         except Exception as e:
-            print(f"[Chat] Error cleaning content: {e}")
+            logger.error("[Chat] Error cleaning content: %s", e)
             content = ""
 
         # Debug log to see what we received
-        print(f"[Chat] Message from {message.author.display_name}: content='{content[:100] if content else '(empty)'}', attachments={len(message.attachments)}, embeds={len(message.embeds)}")
+        logger.debug("[Chat] Message from %s: content=%r, attachments=%d, embeds=%d", speaker_name, content[:100] if content else '(empty)', len(message.attachments), len(message.embeds))
         # Handle 'access' mention commands (Admin only)
         content_lower = content.lower() if content else ""
-        if content_lower.startswith("access") and message.author.id in ADMIN_IDS:
+        if content_lower.startswith("access") and author_id in ADMIN_IDS:
             admin_cog = self.bot.get_cog("AdminCog")
             if admin_cog:
                 await admin_cog.handle_access_mention(message, content)
@@ -78,11 +207,17 @@ class ChatCog(commands.Cog):
             return
 
         # Skip if it looks like a draw request (let draw cog handle it)
-        draw_keywords = ['draw ', 'gdraw ', 'sketch ', 'paint ', 'create an image', 'create a picture', 'guided draw']
-        if any(content_lower.startswith(kw) or f' {kw}' in content_lower for kw in draw_keywords):
+        if DRAW_REQUEST_REGEX.search(content_lower):
             return  # Draw cog will handle this
-        
+
+        # Bare mention with nothing attached - bail before typing() POSTs to Discord
+        if not content and not message.attachments and not message.embeds:
+            return
+
         async with message.channel.typing():
+            # I/O legs started mid-turn - cleaned up in the finally below if the turn fails
+            rag_task = None
+            vision_task = None
             try:
                 # Check for image attachments and Tenor GIF links
                 image_url = None
@@ -90,18 +225,20 @@ class ChatCog(commands.Cog):
 
                 # First, check for direct image and video attachments
                 for attachment in message.attachments:
-                    if attachment.content_type:
-                        if attachment.content_type.startswith("image/"):
-                            if attachment.content_type == "image/gif" or attachment.url.lower().endswith('.gif'):
-                                gif_url = attachment.url
-                            else:
-                                image_url = attachment.url
-                            break
-                        elif attachment.content_type.startswith("video/"):
-                            # Handle video files (MP4, MOV, WebM, etc.) - treat as gif_url for vision analysis
+                    content_type = attachment.content_type
+                    if not content_type:
+                        continue
+                    if content_type.startswith("image/"):
+                        if content_type == "image/gif" or attachment.url.lower().endswith('.gif'):
                             gif_url = attachment.url
-                            print(f"[Chat] Detected video attachment: {attachment.filename} (MIME: {attachment.content_type})")
-                            break
+                        else:
+                            image_url = attachment.url
+                        break
+                    elif content_type.startswith("video/"):
+                        # Handle video files (MP4, MOV, WebM, etc.) - treat as gif_url for vision analysis
+                        gif_url = attachment.url
+                        logger.debug("[Chat] Detected video attachment: %s (MIME: %s)", attachment.filename, content_type)
+                        break
 
                 # Second, check for Tenor GIF links in message content or embeds
                 # Discord's GIF button sends Tenor URLs as plain text or in embeds
@@ -113,13 +250,13 @@ class ChatCog(commands.Cog):
                             if embed.type == "gifv" and hasattr(embed, 'video') and embed.video and embed.video.url:
                                 # Use the MP4 URL - Gemini can analyze video formats
                                 gif_url = embed.video.url
-                                print(f"[Chat] Using embed video URL: {gif_url}")
+                                logger.debug("[Chat] Using embed video URL: %s", gif_url)
                                 break
                             # Some embeds have thumbnail URLs
                             elif hasattr(embed, 'thumbnail') and embed.thumbnail and embed.thumbnail.url:
                                 if 'tenor.com' in embed.thumbnail.url:
                                     gif_url = embed.thumbnail.url
-                                    print(f"[Chat] Using embed thumbnail URL: {gif_url}")
+                                    logger.debug("[Chat] Using embed thumbnail URL: %s", gif_url)
                                     break
 
                     # PRIORITY 2: Parse message content for Tenor URLs
@@ -132,7 +269,7 @@ class ChatCog(commands.Cog):
                                 if embed.url:
                                     search_text += " " + embed.url
 
-                        print(f"[Chat] Searching for Tenor URLs in text: {search_text[:200]}")
+                        logger.debug("[Chat] Searching for Tenor URLs in text: %s", search_text[:200])
 
                         # Match various Tenor URL formats
                         tenor_patterns = [
@@ -147,71 +284,86 @@ class ChatCog(commands.Cog):
                             match = re.search(pattern, search_text)
                             if match:
                                 tenor_url = match.group(0)
-                                print(f"[Chat] Found Tenor URL in text: {tenor_url}")
+                                logger.debug("[Chat] Found Tenor URL in text: %s", tenor_url)
 
                                 # Only use direct media URLs (media.tenor.com or c.tenor.com)
                                 if 'media.tenor.com' in tenor_url or 'c.tenor.com' in tenor_url:
                                     gif_url = tenor_url
-                                    print(f"[Chat] Using direct media URL: {gif_url}")
+                                    logger.debug("[Chat] Using direct media URL: %s", gif_url)
                                     break
                                 else:
                                     # For view pages, skip - we should have already gotten the embed URL
-                                    print(f"[Chat] Skipping view page URL (embed should have direct media): {tenor_url}")
+                                    logger.debug("[Chat] Skipping view page URL (embed should have direct media): %s", tenor_url)
                                     break
                 
                 # ============ SHARED MEMORY LOGIC AI FLOW ============
                 # Note: Summarization is handled by GemGem (single API call)
                 # Astral just reads the summary from shared_summary.txt
 
-                # Step 1: Load short-term context from shared_memory.json
-                # Load all history, format_for_router will handle truncation to last 30 if summary exists
-                shared_history = self.shared_memory.load_memory()
-                formatted_history, summary_context = self.shared_memory.format_for_router(shared_history)
-
-                print(f"[SharedMemory] Loaded {len(shared_history)} messages from shared_memory.json")
-                if summary_context:
-                    print(f"[SharedMemory] Using summary context ({len(summary_context)} chars)")
-
-                # Step 2: Query long-term memory (RAG - conversations only)
-                # Skip RAG for simple greetings or when image/GIF is attached (waste of context)
-                is_greeting = len(content.split()) <= 3 and any(pattern in content.lower() for pattern in BotConfig.GREETING_PATTERNS)
+                # Classify the turn up front so the independent I/O legs (RAG,
+                # vision, shared memory) can all be in flight at the same time
+                is_greeting = len(content.split()) <= 3 and any(pattern in content_lower for pattern in BotConfig.GREETING_PATTERNS)
                 has_image = bool(image_url or gif_url)
+                # Short casual messages rarely hit RAG - let retrieval overlap a speculative reply (Step 5)
+                speculate = (
+                    BotConfig.SPECULATIVE_GENERATION
+                    and not BotConfig.STREAM_REPLIES  # A discarded draft must never reach the screen
+                    and len(content) <= BotConfig.SPECULATIVE_MAX_LENGTH
+                    and "?" not in content
+                )
 
+                # Step 2 (started): Query long-term memory (RAG - conversations only)
+                # Skip RAG for simple greetings or when image/GIF is attached (waste of context)
                 if is_greeting:
-                    long_term_knowledge = []
-                    memory_context = ""
-                    rag_count = 0
-                    print(f"[RAG] Skipping RAG for greeting: '{content[:50]}'")
+                    logger.debug("[RAG] Skipping RAG for greeting: %r", content[:50])
                 elif has_image:
-                    long_term_knowledge = []
-                    memory_context = ""
-                    rag_count = 0
-                    print(f"[RAG] Skipping RAG for image query (vision provides context): '{content[:50]}'")
+                    logger.debug("[RAG] Skipping RAG for image query (vision provides context): %r", content[:50])
+                elif len(content.strip()) < BotConfig.RAG_MIN_LENGTH and "?" not in content:
+                    # "lol", "ok", a lone emoji - no memory is relevant, skip the embedding + DB round trip
+                    logger.debug("[RAG] Skipping RAG for trivial message: %r", content[:50])
                 else:
-                    long_term_knowledge = await retrieve_relevant_knowledge(content, limit=BotConfig.RAG_FACT_LIMIT)
-                    memory_context = format_knowledge_for_context(long_term_knowledge, current_username=message.author.display_name)
-                    rag_count = len(long_term_knowledge)  # Track for footer
-                    if memory_context:
-                        print(f"[RAG] Injecting {len(long_term_knowledge)} facts into context: {memory_context[:200]}")
-                    else:
-                        print(f"[RAG] No relevant memories found for: '{content[:50]}'")
-                
-                # Step 3: Vision analysis with Gemini (if image/GIF attached)
-                # Use Gemini 3-flash-preview for accurate vision, then pass to Grok for response
-                vision_response = None
+                    rag_task = asyncio.create_task(self._retrieve_knowledge(content))
 
+                # Step 3 (started): Vision analysis with Gemini (if image/GIF attached)
+                # Use Gemini 3-flash-preview for accurate vision, then pass to Grok for response
                 if image_url:
                     from tools.vision import describe_image
-                    print(f"[Chat] Using Gemini 3-flash-preview for vision analysis")
-                    vision_response = await describe_image(image_url=image_url, user_context=content)
-                    if vision_response:
-                        print(f"[Vision] Gemini analysis: {vision_response[:150]}...")
+                    logger.debug("[Chat] Using Gemini 3-flash-preview for vision analysis")
+                    vision_task = asyncio.create_task(describe_image(image_url=image_url, user_context=content))
                 elif gif_url:
                     from tools.vision import describe_gif
-                    print(f"[Chat] Using Gemini 3-flash-preview for GIF analysis")
-                    vision_response = await describe_gif(gif_url=gif_url, user_context=content)
+                    logger.debug("[Chat] Using Gemini 3-flash-preview for GIF analysis")
+                    vision_task = asyncio.create_task(describe_gif(gif_url=gif_url, user_context=content))
+
+                # Step 1: Load short-term context from shared_memory.json
+                # Read and format off the event loop (history file + summary file)
+                # so it overlaps the RAG/vision calls above
+                shared_history, formatted_history, summary_context = await asyncio.to_thread(self._load_router_context)
+
+                logger.debug("[SharedMemory] Loaded %d messages from shared_memory.json", len(shared_history))
+                if summary_context:
+                    logger.debug("[SharedMemory] Using summary context (%d chars)", len(summary_context))
+
+                # Step 2 (resolved): collect RAG now, unless Step 5 speculates on it
+                long_term_knowledge = []
+                memory_context = ""
+                rag_count = 0
+                if rag_task and not speculate:
+                    long_term_knowledge = await rag_task
+                    rag_task = None
+                    memory_context = format_knowledge_for_context(long_term_knowledge, current_username=speaker_name)
+                    rag_count = len(long_term_knowledge)  # Track for footer
+                    if memory_context:
+                        logger.info("[RAG] Injecting %d facts into context: %s", len(long_term_knowledge), memory_context[:200])
+                    else:
+                        logger.debug("[RAG] No relevant memories found for: %r", content[:50])
+
+                # Step 3 (resolved)
+                vision_response = None
+                if vision_task:
+                    vision_response = await vision_task
                     if vision_response:
-                        print(f"[Vision] GIF analysis: {vision_response[:150]}...")
+                        logger.debug("[Vision] %s analysis: %s...", 'Gemini' if image_url else 'GIF', vision_response[:150])
 
                 # Step 4: Grok handles search natively (but not vision)
                 # Grok's /v1/responses endpoint searches automatically when needed
@@ -220,25 +372,20 @@ class ChatCog(commands.Cog):
                 
                 # Step 5: Generate response
 
-                # Build context for system prompt (search results and summaries)
-                combined_context = ""
+                # Build per-turn context (search results, image memory) - sent ahead of the transcript
+                context_parts = []
 
                 # ⚠️ SEARCH RESULTS (if no image attached)
                 if search_context:
-                    combined_context += f"⚠️ [SEARCH RESULTS - YOU MUST USE THIS INFO]:\n{search_context}\n\n"
-
-                # === PREVIOUS CONTEXT SUMMARY (from shared_memory) ===
-                if summary_context and not (image_url or gif_url):
-                    combined_context += f"⚠️ {summary_context}\n\n"
+                    context_parts.append(f"⚠️ [SEARCH RESULTS - YOU MUST USE THIS INFO]:\n{search_context}\n\n")
 
                 # Inject cached image descriptions so Astral remembers what she saw (skip if current message has image/GIF)
                 if not (image_url or gif_url):
                     image_context = get_recent_image_context()
                     if image_context:
-                        combined_context += f"{image_context}\n\n"
+                        context_parts.append(f"{image_context}\n\n")
 
-                # === CURRENT SPEAKER ===
-                speaker_name = message.author.display_name
+                combined_context = "".join(context_parts)
 
                 # RAG memory is separate - only use for things NOT in recent chat
                 rag_context = ""
@@ -270,15 +417,42 @@ class ChatCog(commands.Cog):
                 if not user_message and not vision_response:
                     return
 
-                response = await process_message(
+                # Live preview while LM Studio streams (final text replaces it below)
+                streamer = ReplyStreamer(message.channel) if BotConfig.STREAM_REPLIES else None
+
+                generate_args = dict(
                     user_message=user_message,
                     current_speaker=speaker_name,  # Pass speaker separately for system prompt
-                    search_context=combined_context,  # System prompt context (Search results, summaries)
-                    conversation_history=formatted_history, # Full 30-message history (vision injected here for images)
+                    search_context=combined_context,  # Per-turn context (Search results, image memory)
+                    conversation_history=formatted_history, # Bounded history window (vision injected here for images)
                     memory_context=rag_context,  # RAG is deprioritized
                     has_vision=False,  # Disable Grok vision - using Gemini instead
-                    image_url=None  # Don't pass image to Grok - Gemini handles vision
+                    image_url=None,  # Don't pass image to Grok - Gemini handles vision
+                    summary="" if (image_url or gif_url) else summary_context,  # Evicted-history summary (system prompt)
+                    on_text=streamer.feed if streamer else None
                 )
+
+                if rag_task:
+                    # Speculative path: draft without RAG while retrieval finishes,
+                    # then keep the draft only if retrieval came back empty
+                    draft_task = asyncio.create_task(process_message(**generate_args))
+                    try:
+                        long_term_knowledge = await rag_task
+                        memory_context = format_knowledge_for_context(long_term_knowledge, current_username=speaker_name)
+                        if memory_context:
+                            draft_task.cancel()
+                            rag_count = len(long_term_knowledge)
+                            logger.info("[RAG] Injecting %d facts into context (speculative reply discarded): %s", rag_count, memory_context[:200])
+                            generate_args["memory_context"] = f"[Old memories - only reference if not covered above]:\n{memory_context}"
+                            response = await process_message(**generate_args)
+                        else:
+                            logger.debug("[RAG] No relevant memories found, using speculative reply for: %r", content[:50])
+                            response = await draft_task
+                    finally:
+                        if not draft_task.done():
+                            draft_task.cancel()
+                else:
+                    response = await process_message(**generate_args)
                 
                 # === DETERMINISTIC ATTRIBUTION FOOTERS ===
                 # Build footer based on what tools actually ran (same line)
@@ -293,11 +467,13 @@ class ChatCog(commands.Cog):
                     # Truncate if needed to fit footer
                     if len(response) + len(footer) > 2000:
                         response = response[:2000 - len(footer) - 5] + "..."
+
+                # Footers are display-only - keep the footer-free reply for storage
+                clean_response = response
+                if footer_parts:
                     response += footer
-                
+
                 # Step 6: Store conversation to shared_memory.json
-                # Strip footers before saving — they're display-only
-                clean_response = re.sub(r'\n\n[💡🔍]\d+(?:\s[💡🔍]\d+)*$', '', response)
 
                 # For images, store the vision description with the response
                 if vision_response:
@@ -310,55 +486,68 @@ class ChatCog(commands.Cog):
                 self.shared_memory.append_conversation_turn(
                     user_message=content if content else "[attached an image]",
                     bot_response=memory_response,
-                    username=message.author.display_name
+                    username=speaker_name
                 )
-                print(f"[SharedMemory] Stored conversation turn for {message.author.display_name}")
-
-                # Also store to RAG for long-term fact extraction
-                context_for_rag = "\n".join([msg["content"] for msg in formatted_history[-5:]]) if len(formatted_history) > 1 else None
-                await store_conversation(
-                    user_message=content if content else "[attached an image]",
-                    astra_response=clean_response,
-                    user_id=str(message.author.id),
-                    username=message.author.display_name,
-                    channel_id=str(message.channel.id),
-                    guild_id=str(message.guild.id) if message.guild else None,
-                    conversation_context=context_for_rag
-                )
-
-
+                logger.debug("[SharedMemory] Stored conversation turn for %s", speaker_name)
 
                 # ============ END SHARED MEMORY LOGIC AI FLOW ============
                 
                 # Send response (split if too long) - use channel.send so other bots can see
-                if len(response) > 2000:
-                    chunks = [response[i:i+2000] for i in range(0, len(response), 2000)]
-                    for chunk in chunks:
+                finished = await streamer.finish(response) if streamer else False
+                if finished:
+                    pass  # Final text was edited into the live preview message
+                elif finished is None:
+                    pass  # Preview is stuck on screen - resending would show the reply twice
+                elif len(response) > 2000:
+                    for chunk in split_for_discord(response):
                         await message.channel.send(chunk)
                 else:
                     await message.channel.send(response)
+
+                # Also store to RAG for long-term fact extraction - a Gemini call,
+                # an embedding and a DB write that don't feed the reply, so they
+                # run in the background after it has been sent
+                context_for_rag = "\n".join([msg["content"] for msg in formatted_history[-5:]]) if len(formatted_history) > 1 else None
+                spawn_background(store_conversation(
+                    user_message=content if content else "[attached an image]",
+                    astra_response=clean_response,
+                    user_id=str(author_id),
+                    username=speaker_name,
+                    channel_id=str(message.channel.id),
+                    guild_id=str(message.guild.id) if message.guild else None,
+                    conversation_context=context_for_rag
+                ))
                 
                 # Speak response if in voice channel
-                if message.guild and message.guild.voice_client:
+                voice_client = message.guild.voice_client if message.guild else None
+                if voice_client and voice_client.is_connected():
                     try:
                         voice_handler = get_voice_handler(self.bot)
-                        # Strip citation markers and footer emojis so TTS doesn't read them
-                        tts_text = re.sub(r'\[(?:🔍|💡)?\d+\]', '', response)  # [1], [🔍1], [💡2]
-                        tts_text = re.sub(r'\n\n[💡🔍]\d+(?:\s[💡🔍]\d+)*$', '', tts_text)  # footer line
-                        await voice_handler.speak_text(message.guild, tts_text.strip())
+                        # clean_response has no footer - only citation markers to strip
+                        tts_text = CITATION_REGEX.sub('', clean_response).strip()
+                        await voice_handler.speak_text(message.guild, tts_text)
                     except Exception as ve:
-                        print(f"[Voice] TTS error: {ve}")
+                        logger.error("[Voice] TTS error: %s", ve)
                     
             except Exception as e:
-                print(f"[Chat Error] {e}")
-                traceback.print_exc()
+                logger.error("[Chat Error] %s", e, exc_info=True)
                 await message.channel.send("uh something broke lol, try again?")
+            finally:
+                # A turn that failed before collecting RAG/vision must not leave
+                # them running, or their errors surface as "never retrieved"
+                for task in (rag_task, vision_task):
+                    if task is None:
+                        continue
+                    if not task.done():
+                        task.cancel()
+                    elif not task.cancelled():
+                        task.exception()  # Mark any failure as retrieved
 
 
     @commands.Cog.listener()
     async def on_ready(self):
         """Log when bot is ready."""
-        print("[Chat] Astral ready - Reading summary from GemGem's shared_summary.txt...")
+        logger.info("[Chat] Astral ready - Reading summary from GemGem's shared_summary.txt...")
 
 
 async def setup(bot: commands.Bot):
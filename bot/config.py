@@ -25,6 +25,12 @@ class BotConfig:
     RETRIEVAL_SIMILARITY_THRESHOLD = float(os.getenv("RETRIEVAL_THRESHOLD", "0.78"))
     """Similarity threshold for knowledge retrieval"""
 
+    RAG_TIMEOUT = float(os.getenv("RAG_TIMEOUT", "10"))
+    """Seconds to wait for long-term memory retrieval before replying without it"""
+
+    RAG_MIN_LENGTH = int(os.getenv("RAG_MIN_LENGTH", "8"))
+    """Messages shorter than this (chars, no question mark) skip long-term memory retrieval"""
+
     # ========== AI Model Token Limits ==========
     TOOL_DECISION_TOKENS = int(os.getenv("TOOL_DECISION_TOKENS", "256"))
     """Token limit for tool decision making"""
@@ -35,12 +41,26 @@ class BotConfig:
     SUMMARIZATION_TOKENS = int(os.getenv("SUMMARIZATION_TOKENS", "1200"))
     """Token limit for conversation summarization"""
 
-    DEFAULT_RESPONSE_TOKENS = int(os.getenv("DEFAULT_RESPONSE_TOKENS", "8000"))
-    """Default token limit for responses (with context)"""
+    DEFAULT_RESPONSE_TOKENS = int(os.getenv("DEFAULT_RESPONSE_TOKENS", "4000"))
+    """Token limit for responses with search context (results eat into the context window)"""
 
-    RESPONSE_TOKENS_NO_CONTEXT = int(os.getenv("RESPONSE_TOKENS_NO_CONTEXT", "4000"))
+    RESPONSE_TOKENS_NO_CONTEXT = int(os.getenv("RESPONSE_TOKENS_NO_CONTEXT", "8000"))
     """Token limit for responses without search context"""
 
+    # ========== Speculative Generation ==========
+    SPECULATIVE_GENERATION = os.getenv("SPECULATIVE_GENERATION", "0") == "1"
+    """Draft a reply without RAG while retrieval runs; keep it if RAG finds nothing"""
+
+    SPECULATIVE_MAX_LENGTH = int(os.getenv("SPECULATIVE_MAX_LENGTH", "80"))
+    """Longest message (chars) eligible for speculative generation"""
+
+    # ========== Streaming Replies ==========
+    STREAM_REPLIES = os.getenv("STREAM_REPLIES", "0") == "1"
+    """Show replies while they generate by editing a live preview message"""
+
+    STREAM_EDIT_INTERVAL = float(os.getenv("STREAM_EDIT_INTERVAL", "1.5"))
+    """Minimum seconds between preview edits (Discord rate-limits message edits)"""
+
     # ========== Greeting Detection ==========
     GREETING_PATTERNS = [
         'hi', 'hello', 'hey', 'sup', 'yo',
@@ -150,9 +150,16 @@ async def load_cogs():
 
 async def main():
     """Main entry point."""
+    from ai.router import close_session
+    from tools.vision import close_session as close_vision_session
+
     async with bot:
         await load_cogs()
-        await bot.start(DISCORD_TOKEN)
+        try:
+            await bot.start(DISCORD_TOKEN)
+        finally:
+            await close_session()
+            await close_vision_session()
 
 
 if __name__ == "__main__":
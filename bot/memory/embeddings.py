@@ -1,5 +1,6 @@
 """Google Embeddings Client - Free tier text embeddings."""
 import os
+import asyncio
 from google import genai
 from typing import Optional
 
@@ -27,7 +28,9 @@ async def get_embedding(text: str) -> Optional[list[float]]:
         return None
 
     try:
-        result = client.models.embed_content(
+        # The SDK call is blocking - run it off the event loop
+        result = await asyncio.to_thread(
+            client.models.embed_content,
             model=EMBEDDING_MODEL,
             contents=text,
             config={"task_type": "retrieval_document"}
@@ -44,7 +47,8 @@ async def get_query_embedding(text: str) -> Optional[list[float]]:
         return None
 
     try:
-        result = client.models.embed_content(
+        result = await asyncio.to_thread(
+            client.models.embed_content,
             model=EMBEDDING_MODEL,
             contents=text,
             config={"task_type": "retrieval_query"}
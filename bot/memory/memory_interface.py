@@ -27,6 +27,10 @@ from memory.embeddings import get_embedding, get_query_embedding
 # Initialize Gemini client for fact extraction
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 gemini_client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
+_FACT_GEN_CFG = types.GenerateContentConfig(
+    temperature=0.1,
+    max_output_tokens=100
+)
 
 # Initialize Memory Alaya with DuckDB backend
 # Store in bot's own db directory, separate from shared code
@@ -170,13 +174,13 @@ If the conversation contains no substantial long-term information, respond with:
 Respond with the fact or NONE:"""
 
     try:
-        response = gemini_client.models.generate_content(
+        # Blocking SDK call - run it off the event loop so background fact
+        # extraction doesn't stall replies to other messages
+        response = await asyncio.to_thread(
+            gemini_client.models.generate_content,
             model="gemini-2.5-flash",
             contents=prompt,
-            config=types.GenerateContentConfig(
-                temperature=0.1,
-                max_output_tokens=100
-            )
+            config=_FACT_GEN_CFG
         )
         result = response.text.strip()
 
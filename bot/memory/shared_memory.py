@@ -12,13 +12,42 @@ import os
 import json
 import re
 from datetime import datetime
+from itertools import islice
 from typing import Optional
 
+try:
+    import orjson
+except ImportError:  # Optional - stdlib json is used when it isn't installed
+    orjson = None
+
+# The history file is re-read and rewritten every turn (up to MAX_HISTORY
+# messages). Both backends work on raw UTF-8 bytes and produce identical
+# indent=2 output, so the file format doesn't depend on which is installed.
+if orjson is not None:
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+else:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+# Footer/citation cleanup for Astral's stored replies - compiled once, applied
+# to every model message in the router window on every turn
+_SEARCH_MARKER_RE = re.compile(r'\[🔍\d*\]')
+_MEMORY_MARKER_RE = re.compile(r'\[💡\d*\]')
+_SPARKLE_MARKER_RE = re.compile(r'\[✨\]')
+_SPEED_FOOTER_RE = re.compile(r'\s*🚗[\d.]+ T/s')
+_COUNT_FOOTER_RE = re.compile(r'\n\n[💡🔍]\d+(?:\s[💡🔍]\d+)*$')
+
 
 class SharedMemoryManager:
     """Manages persistent conversation memory for all users and bots in a single file."""
 
     MAX_HISTORY = 1500  # Maximum messages total (rolling window) - Leverages Grok 4.1's 2M token context
+    ROUTER_HISTORY = 50  # Messages handed to the router per turn (older ones live in the summary)
     MEMORY_FILE = "shared_memory.json"
     SUMMARY_FILE = "shared_summary.txt"
 
@@ -34,6 +63,31 @@ class SharedMemoryManager:
             os.makedirs(self.memory_dir)
         self.memory_file = os.path.join(self.memory_dir, self.MEMORY_FILE)
         self.summary_file = os.path.join(self.memory_dir, self.SUMMARY_FILE)
+        # (inode, mtime_ns, size) of the summary file -> its stripped text.
+        # GemGem rewrites it (atomically) only every SUMMARY_INTERVAL messages,
+        # so most turns can skip re-reading it
+        self._summary_cache: Optional[tuple[tuple[int, int, int], str]] = None
+        # Same idea for the parsed history: a turn loads it for the router and
+        # again to append the reply, and our own save can seed the next load.
+        # Callers get a copy of the list so append/extend never touches it
+        self._history_cache: Optional[tuple[tuple[int, int, int], list[dict]]] = None
+
+    def _read_summary(self) -> Optional[str]:
+        """Read the summary file, reusing the last read while the file is unchanged."""
+        try:
+            st = os.stat(self.summary_file)
+        except FileNotFoundError:
+            return None
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._summary_cache
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        with open(self.summary_file, "r", encoding="utf-8") as f:
+            summary = f.read().strip()
+        self._summary_cache = (key, summary)
+        return summary
 
     def load_memory(self) -> list[dict]:
         """
@@ -44,18 +98,29 @@ class SharedMemoryManager:
         """
         history = []
 
-        if os.path.exists(self.memory_file):
-            try:
-                with open(self.memory_file, "r", encoding="utf-8") as f:
-                    history = json.load(f)
-            except Exception as e:
-                print(f"[SharedMemory] Failed to load: {e}")
+        try:
+            st = os.stat(self.memory_file)
+        except FileNotFoundError:
+            return history
+
+        key = (st.st_ino, st.st_mtime_ns, st.st_size)
+        cached = self._history_cache
+        if cached is not None and cached[0] == key:
+            return list(cached[1])
+
+        try:
+            with open(self.memory_file, "rb") as f:
+                history = _json_loads(f.read())
+        except Exception as e:
+            print(f"[SharedMemory] Failed to load: {e}")
+            return history
 
         # Apply rolling window (keep last MAX_HISTORY messages)
         if len(history) > self.MAX_HISTORY:
             history = history[-self.MAX_HISTORY:]
 
-        return history
+        self._history_cache = (key, history)
+        return list(history)
 
     def save_memory(self, history: list[dict]) -> bool:
         """
@@ -72,8 +137,18 @@ class SharedMemoryManager:
             history = history[-self.MAX_HISTORY:]
 
         try:
-            with open(self.memory_file, "w", encoding="utf-8") as f:
-                json.dump(history, f, indent=2)
+            # Atomic write: temp file + rename, so a concurrent load_memory()
+            # (off-loop reader, or GemGem) never sees a half-written file
+            temp_path = self.memory_file + ".tmp"
+            with open(temp_path, "wb") as f:
+                f.write(_json_dumps(history))
+                f.flush()
+                # Key what we wrote, not whatever sits at memory_file after the
+                # rename (GemGem may have replaced it in between). The rename
+                # keeps inode, mtime and size
+                st = os.fstat(f.fileno())
+            os.replace(temp_path, self.memory_file)
+            self._history_cache = ((st.st_ino, st.st_mtime_ns, st.st_size), list(history))
             return True
         except Exception as e:
             print(f"[SharedMemory] Failed to save: {e}")
@@ -91,25 +166,26 @@ class SharedMemoryManager:
 
         Returns:
             tuple: (formatted_history, summary_context)
-                - formatted_history: List of {role, content} dicts for router
+                - formatted_history: List of {role, content} dicts for router,
+                  at most ROUTER_HISTORY (30 when a summary exists) messages
                 - summary_context: Summary text to inject into system prompt (empty if no summary)
         """
         formatted = []
         summary_context = ""
+        window = self.ROUTER_HISTORY
 
         # Load summary if available
-        if include_summary and os.path.exists(self.summary_file):
-            with open(self.summary_file, "r", encoding="utf-8") as f:
-                summary = f.read().strip()
+        if include_summary:
+            summary = self._read_summary()
 
             if summary:
                 summary_context = f"[PREVIOUS CONTEXT SUMMARY - READ THIS FIRST]:\n{summary}"
 
                 # Truncate history to last 30 messages (since we have summary)
-                if len(history) > 30:
-                    history = history[-30:]
+                window = 30
 
-        for msg in history:
+        # Walk only the tail the router will see, without slice-copying the full history
+        for msg in islice(history, max(len(history) - window, 0), None):
             original_content = msg["parts"][0] if msg["parts"] else ""
 
             if msg["role"] == "user" and msg.get("username"):
@@ -126,13 +202,16 @@ class SharedMemoryManager:
                 cleaned_content = original_content
                 if isinstance(cleaned_content, str):
                     # Strip Astral citation markers: [🔍1], [💡2], [✨], etc.
-                    cleaned_content = re.sub(r'\[🔍\d*\]', '', cleaned_content)
-                    cleaned_content = re.sub(r'\[💡\d*\]', '', cleaned_content)
-                    cleaned_content = re.sub(r'\[✨\]', '', cleaned_content)
+                    if '[' in cleaned_content:
+                        cleaned_content = _SEARCH_MARKER_RE.sub('', cleaned_content)
+                        cleaned_content = _MEMORY_MARKER_RE.sub('', cleaned_content)
+                        cleaned_content = _SPARKLE_MARKER_RE.sub('', cleaned_content)
                     # Strip Astral speed footer: 🚗24.1 T/s
-                    cleaned_content = re.sub(r'\s*🚗[\d.]+ T/s', '', cleaned_content)
+                    if '🚗' in cleaned_content:
+                        cleaned_content = _SPEED_FOOTER_RE.sub('', cleaned_content)
                     # Strip footer line: 💡2 🔍3
-                    cleaned_content = re.sub(r'\n\n[💡🔍]\d+(?:\s[💡🔍]\d+)*$', '', cleaned_content)
+                    if '\n\n' in cleaned_content:
+                        cleaned_content = _COUNT_FOOTER_RE.sub('', cleaned_content)
 
                 formatted.append({
                     "role": "user",  # Router expects all as "user" role
@@ -220,12 +299,10 @@ class SharedMemoryManager:
 
     def load_summary(self) -> Optional[str]:
         """Load conversation summary if it exists."""
-        if os.path.exists(self.summary_file):
-            try:
-                with open(self.summary_file, "r", encoding="utf-8") as f:
-                    return f.read().strip()
-            except Exception as e:
-                print(f"[SharedMemory] Failed to load summary: {e}")
+        try:
+            return self._read_summary()
+        except Exception as e:
+            print(f"[SharedMemory] Failed to load summary: {e}")
         return None
 
     def save_summary(self, summary: str) -> bool:
@@ -3,12 +3,13 @@ import os
 
 
 # --- ROOT ADMIN IDS (same as GemGem) ---
-ADMIN_IDS = {
+# Immutable - checked on every message and command, never changed at runtime
+ADMIN_IDS = frozenset({
     69353483425292288,
     1365378902301741071,
     1324163881664253994,
     1225645079364894775,
-}
+})
 
 
 class WhitelistManager:
@@ -1,7 +1,11 @@
 """Time utilities for GemGem."""
+import time
 from datetime import datetime
 import pytz
 
+# get_date_context() only has minute resolution - timezone -> (minute, rendered string)
+_date_context_cache: dict[str, tuple[int, str]] = {}
+
 
 def get_current_time(timezone: str = "America/Los_Angeles") -> str:
     """Get current time in a human-readable format."""
@@ -15,11 +19,21 @@ def get_current_time(timezone: str = "America/Los_Angeles") -> str:
 
 
 def get_date_context(timezone: str = "America/Los_Angeles") -> str:
-    """Get current date and time context for prompt injection."""
+    """Get current date and time context for prompt injection.
+    Rendered at most once per minute per timezone; repeat calls reuse the string.
+    """
+    minute = int(time.time() // 60)
+    cached = _date_context_cache.get(timezone)
+    if cached and cached[0] == minute:
+        return cached[1]
+
     try:
         tz = pytz.timezone(timezone)
         now = datetime.now(tz)
-        return f"Current time: {now.strftime('%A, %B %d, %Y at %I:%M %p %Z')}."
+        context = f"Current time: {now.strftime('%A, %B %d, %Y at %I:%M %p %Z')}."
     except Exception:
         now = datetime.now()
-        return f"Current time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}."
+        context = f"Current time: {now.strftime('%A, %B %d, %Y at %I:%M %p')}."
+
+    _date_context_cache[timezone] = (minute, context)
+    return context
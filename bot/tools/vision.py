@@ -7,11 +7,12 @@ import os
 import aiohttp
 import asyncio
 import base64
+import time
 from google import genai
 from google.genai import types
 from io import BytesIO
 from datetime import datetime
-from collections import deque
+from collections import OrderedDict, deque
 import pytz
 
 # Import character system for recognition
@@ -28,6 +29,60 @@ client = genai.Client(api_key=GEMINI_API_KEY) if GEMINI_API_KEY else None
 # Vision model - Gemini 3.0 Flash
 GEMINI_VISION_MODEL = "gemini-3-flash-preview"  # Gemini 3.0 Flash Preview
 
+# Generation configs are immutable - build them once rather than per request
+_VISION_SAFETY_SETTINGS = [
+    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"),
+    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"),
+    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"),
+    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"),
+]
+
+_IMAGE_GEN_CFG = types.GenerateContentConfig(
+    temperature=0.5,  # Increased from 0.3 to encourage longer, more detailed descriptions
+    max_output_tokens=1024,  # Increased from 800 to allow more detail
+    top_p=0.95,
+    top_k=40,
+    safety_settings=_VISION_SAFETY_SETTINGS
+)
+
+_GIF_GEN_CFG = types.GenerateContentConfig(
+    temperature=0.6,  # Slightly higher for expressive GIF descriptions
+    max_output_tokens=800,
+    top_p=0.95,
+    top_k=40,
+    safety_settings=_VISION_SAFETY_SETTINGS
+)
+
+# Shared session for image/GIF downloads - reuses Discord CDN connections
+# instead of a fresh TCP+TLS handshake per attachment
+_session: aiohttp.ClientSession | None = None
+_GIF_FETCH_TIMEOUT = aiohttp.ClientTimeout(total=10)
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    """Return the shared download session, creating it on first use."""
+    global _session
+    if _session is None or _session.closed:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit_per_host=8, keepalive_timeout=60, ttl_dns_cache=300)
+        )
+    return _session
+
+
+async def close_session():
+    """Close the shared download session (call on bot shutdown)."""
+    global _session
+    if _session is not None and not _session.closed:
+        await _session.close()
+    _session = None
+
+
+# Recent GIF descriptions - the same Tenor reaction GIF gets reposted a lot,
+# and re-describing it is a full download + Gemini round trip
+_GIF_CACHE_TTL = 600.0  # seconds
+_GIF_CACHE_SIZE = 64
+_gif_cache: OrderedDict[tuple[str, str], tuple[float, str]] = OrderedDict()  # (url, context) -> (time, description)
+
 # Short-term image cache (last 5 images)
 # Stores: {"username": str, "description": str, "timestamp": str, "user_context": str}
 _recent_images = deque(maxlen=5)
@@ -41,12 +96,12 @@ async def describe_image(image_url: str = None, image_data: bytes = None, user_c
     # Get image data if URL provided
     if image_url and not image_data:
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(image_url) as resp:
-                    if resp.status != 200:
-                        return None
-                    mime_type = resp.headers.get('Content-Type', mime_type)
-                    image_data = await resp.read()
+            session = await _get_session()
+            async with session.get(image_url) as resp:
+                if resp.status != 200:
+                    return None
+                mime_type = resp.headers.get('Content-Type', mime_type)
+                image_data = await resp.read()
         except Exception as e:
             print(f"[Vision] Failed to fetch image: {e}")
             return None
@@ -112,21 +167,13 @@ async def describe_image(image_url: str = None, image_data: bytes = None, user_c
             types.Part.from_text(text=description_prompt)
         ]
 
-        response = client.models.generate_content(
+        # The SDK call is blocking - run it off the event loop so RAG and the
+        # shared-memory load started alongside this task keep progressing
+        response = await asyncio.to_thread(
+            client.models.generate_content,
             model=GEMINI_VISION_MODEL,
             contents=content_parts,
-            config=types.GenerateContentConfig(
-                temperature=0.5,  # Increased from 0.3 to encourage longer, more detailed descriptions
-                max_output_tokens=1024,  # Increased from 800 to allow more detail
-                top_p=0.95,
-                top_k=40,
-                safety_settings=[
-                    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"),
-                ]
-            )
+            config=_IMAGE_GEN_CFG
         )
 
         # Debug: Check why Gemini is truncating
@@ -157,7 +204,6 @@ async def analyze_image(image_url: str, user_prompt: str = "", conversation_cont
     Also stores in short-term cache and RAG for recall.
     """
     from ai.router import process_message
-    from memory import store_image_knowledge  # Deprecated no-op
     
     # Step 1: Get Gemini's objective description WITH user context
     description = await describe_image(image_url=image_url, user_context=user_prompt)
@@ -225,16 +271,25 @@ async def describe_gif(gif_url: str, user_context: str = "") -> str:
         print("[Vision] No Gemini API key configured")
         return None
 
+    cache_key = (gif_url, user_context)
+    cached = _gif_cache.get(cache_key)
+    if cached is not None:
+        if time.monotonic() - cached[0] < _GIF_CACHE_TTL:
+            _gif_cache.move_to_end(cache_key)
+            print(f"[Vision] GIF cache hit: {gif_url[:80]}")
+            return cached[1]
+        del _gif_cache[cache_key]
+
     try:
         # Fetch GIF data
-        async with aiohttp.ClientSession() as session:
-            async with session.get(gif_url, timeout=aiohttp.ClientTimeout(total=10)) as resp:
-                if resp.status != 200:
-                    print(f"[Vision] Failed to fetch GIF: HTTP {resp.status}")
-                    return None
+        session = await _get_session()
+        async with session.get(gif_url, timeout=_GIF_FETCH_TIMEOUT) as resp:
+            if resp.status != 200:
+                print(f"[Vision] Failed to fetch GIF: HTTP {resp.status}")
+                return None
 
-                gif_data = await resp.read()
-                mime_type = resp.headers.get('Content-Type', 'image/gif')
+            gif_data = await resp.read()
+            mime_type = resp.headers.get('Content-Type', 'image/gif')
 
         if not gif_data:
             return None
@@ -289,25 +344,21 @@ Keep description to 3-4 sentences focusing on what makes this GIF notable or exp
             types.Part.from_text(text=gif_prompt)
         ]
 
-        response = client.models.generate_content(
+        # The SDK call is blocking - run it off the event loop so RAG and the
+        # shared-memory load started alongside this task keep progressing
+        response = await asyncio.to_thread(
+            client.models.generate_content,
             model=GEMINI_VISION_MODEL,
             contents=content_parts,
-            config=types.GenerateContentConfig(
-                temperature=0.6,  # Slightly higher for expressive GIF descriptions
-                max_output_tokens=800,
-                top_p=0.95,
-                top_k=40,
-                safety_settings=[
-                    types.SafetySetting(category="HARM_CATEGORY_HATE_SPEECH", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_HARASSMENT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_SEXUALLY_EXPLICIT", threshold="BLOCK_NONE"),
-                    types.SafetySetting(category="HARM_CATEGORY_DANGEROUS_CONTENT", threshold="BLOCK_NONE"),
-                ]
-            )
+            config=_GIF_GEN_CFG
         )
 
         description = response.text.strip()
         print(f"[Vision] GIF analysis ({len(description)} chars): {description[:150]}{'...' if len(description) > 150 else ''}")
+        if description:
+            _gif_cache[cache_key] = (time.monotonic(), description)
+            if len(_gif_cache) > _GIF_CACHE_SIZE:
+                _gif_cache.popitem(last=False)
         return description
 
     except asyncio.TimeoutError:
@@ -2,11 +2,27 @@
 Centralized logging configuration for Astra Discord Bot.
 Replaces scattered print() statements with structured logging.
 """
+import atexit
 import logging
 import os
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from datetime import datetime
 
+# Background thread that does the actual console/file writes (see setup_logging)
+_listener: QueueListener | None = None
+
+
+def _stop_listener():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(_stop_listener)
+
 
 def setup_logging(log_level: str = None) -> logging.Logger:
     """
@@ -56,12 +72,12 @@ def setup_logging(log_level: str = None) -> logging.Logger:
 
     # Remove existing handlers to avoid duplicates
     root_logger.handlers.clear()
+    _stop_listener()
 
     # Console handler (INFO and above)
     console_handler = logging.StreamHandler()
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    root_logger.addHandler(console_handler)
 
     # File handler - rotating (all levels)
     file_handler = RotatingFileHandler(
@@ -72,7 +88,6 @@ def setup_logging(log_level: str = None) -> logging.Logger:
     )
     file_handler.setLevel(logging.DEBUG)
     file_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(file_handler)
 
     # Error file handler (errors only)
     error_handler = RotatingFileHandler(
@@ -83,7 +98,17 @@ def setup_logging(log_level: str = None) -> logging.Logger:
     )
     error_handler.setLevel(logging.ERROR)
     error_handler.setFormatter(detailed_formatter)
-    root_logger.addHandler(error_handler)
+
+    # Log calls on the event loop only enqueue the record - stdout and file
+    # writes (and log rotation) happen on the listener's thread
+    global _listener
+    log_queue = queue.SimpleQueue()
+    root_logger.addHandler(QueueHandler(log_queue))
+    _listener = QueueListener(
+        log_queue, console_handler, file_handler, error_handler,
+        respect_handler_level=True
+    )
+    _listener.start()
 
     # Silence noisy libraries
     logging.getLogger('discord').setLevel(logging.WARNING)